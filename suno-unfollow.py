@@ -4,25 +4,29 @@ import random
 import os
 import sys
 import time
-import json 
 import re
 from typing import List, Set, Optional
 from dataclasses import dataclass
 from contextlib import asynccontextmanager
 from logging.handlers import RotatingFileHandler
+import aiohttp
+import orjson
 from playwright.async_api import async_playwright, Page, BrowserContext, Response, Browser
+from playwright.async_api import TimeoutError as PlaywrightTimeoutError
 
 @dataclass
 class User:
     username: str
     
+    _USERNAME_RE = re.compile(r'\A[\w\-]{2,30}\Z')
+    
     @staticmethod
     def validate_username(username: str) -> bool:
         """Validate username format and content"""
         if not username or not isinstance(username, str):
             return False
         cleaned = username.replace('@', '').strip()
-        return bool(re.match(r'^[\w\-]{2,30}$', cleaned))
+        return bool(User._USERNAME_RE.match(cleaned))
 
 class RateLimitError(Exception):
     """Custom exception for rate limiting"""
@@ -32,10 +36,62 @@ class SessionError(Exception):
     """Custom exception for session issues"""
     pass
 
+class TokenBucket:
+    """Adaptive token bucket: halves its rate on 429s and grows it after a run of successes"""
+
+    def __init__(self, rate: float, burst: int, min_rate: float = 1 / 120,
+                 max_rate: float = 1.0, grow_after: int = 5):
+        self.rate = min(max(rate, min_rate), max_rate)
+        self.burst = burst
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.grow_after = grow_after
+        self.tokens = float(burst)
+        self.paused_until = 0.0
+        self._updated = time.monotonic()
+        self._successes = 0
+        self._lock = asyncio.Lock()
+
+    def _refill(self) -> None:
+        # No tokens accrue during a Retry-After pause, so it doesn't end in a burst
+        now = time.monotonic()
+        start = max(self._updated, self.paused_until)
+        if now > start:
+            self.tokens = min(self.burst, self.tokens + (now - start) * self.rate)
+        self._updated = now
+
+    async def acquire(self) -> None:
+        """Wait until a token is available and no Retry-After pause is in effect, then take it"""
+        async with self._lock:
+            # Re-check after every sleep: a 429 may have paused us or cut the rate meanwhile
+            while True:
+                self._refill()
+                pause = self.paused_until - time.monotonic()
+                if pause <= 0 and self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep(max(pause, (1 - self.tokens) / self.rate))
+
+    def on_success(self) -> None:
+        """Speed up by 10% after every grow_after consecutive successes"""
+        self._successes += 1
+        if self._successes >= self.grow_after:
+            self._successes = 0
+            self.rate = min(self.max_rate, self.rate * 1.1)
+
+    def on_rate_limited(self, retry_after: float) -> None:
+        """Halve the rate, drop any saved-up burst and hold off for Retry-After seconds"""
+        self._successes = 0
+        self.rate = max(self.min_rate, self.rate / 2)
+        self.tokens = 0.0
+        self.paused_until = max(self.paused_until, time.monotonic() + retry_after)
+
 class SunoBot:
-    def __init__(self, headless: bool = False, user_data_dir: str = None):
+    def __init__(self, headless: bool = False, user_data_dir: str = None,
+                 essential_cookies: Optional[List[str]] = None):
         self.headless = headless
         self.base_url = "https://suno.com"
+        self.api_url = "https://studio-api.prod.suno.com"
         self.browser = None
         self.playwright = None
         self.script_dir = os.path.dirname(os.path.abspath(__file__))
@@ -44,7 +100,20 @@ class SunoBot:
         self.page = None
         self.context = None
         self.MAX_RETRIES = 3
-        self.processed_users = set()
+        self._page_pool = None
+        # Suno signs in through Clerk, which keeps the long-lived signed-in marker in __client_uat
+        # (a '_<suffix>' variant on newer Clerk versions; value '0' when signed out).
+        # The __session JWT itself expires within a minute, so it can't gate anything.
+        self.ESSENTIAL_COOKIES = essential_cookies or ['__client_uat']
+        self.progress_file = os.path.join(self.script_dir, 'unfollow_progress.txt')
+        self.processed_users = self._load_progress()
+        self.AUTH_TTL = 600
+        self._auth = None
+        self._auth_expiry = 0.0
+        self._auth_lock = asyncio.Lock()
+        self._ratelimit_until = 0.0
+        self.rate_state_file = os.path.join(self.script_dir, 'rate_limit_state.json')
+        self._bucket = TokenBucket(rate=self._load_rate(), burst=3)
 
     def _validate_user_data_dir(self, user_data_dir: Optional[str]) -> str:
         if user_data_dir:
@@ -65,6 +134,56 @@ class SunoBot:
         self.logger.info(f"Using browser data directory: {full_path}")
         return full_path
         
+    def _load_progress(self) -> Set[str]:
+        """Load users already unfollowed in previous runs"""
+        if not os.path.exists(self.progress_file):
+            return set()
+
+        with open(self.progress_file) as f:
+            processed = set(f.read().split())
+
+        self.logger.info(f"Loaded {len(processed)} previously unfollowed users from progress file")
+        return processed
+
+    def _load_rate(self, default: float = 1 / 10) -> float:
+        """Load the unfollow rate tuned by previous runs"""
+        try:
+            with open(self.rate_state_file, 'rb') as f:
+                rate = float(orjson.loads(f.read())['rate'])
+            if rate <= 0:
+                raise ValueError(f"invalid rate {rate}")
+        except FileNotFoundError:
+            return default
+        except Exception as e:
+            self.logger.warning(f"Ignoring unreadable rate state file: {str(e)}")
+            return default
+
+        self.logger.info(f"Loaded tuned unfollow rate: one every {1 / rate:.1f} seconds")
+        return rate
+
+    def _save_rate(self) -> None:
+        """Persist the current unfollow rate for the next run"""
+        try:
+            with open(self.rate_state_file, 'wb') as f:
+                f.write(orjson.dumps({'rate': self._bucket.rate}))
+        except Exception as e:
+            self.logger.error(f"Error saving rate state: {str(e)}")
+
+    def _open_progress_file(self):
+        """Open the progress file for appends, terminating a last entry left without a newline"""
+        # Older versions wrote '\n' before each entry, so their files don't end in a newline
+        needs_newline = False
+        if os.path.exists(self.progress_file) and os.path.getsize(self.progress_file) > 0:
+            with open(self.progress_file, 'rb') as f:
+                f.seek(-1, os.SEEK_END)
+                needs_newline = f.read(1) != b'\n'
+
+        # Line-buffered so each success reaches disk without reopening the file
+        fh = open(self.progress_file, 'a', buffering=1)
+        if needs_newline:
+            fh.write('\n')
+        return fh
+
     def _setup_logging(self) -> None:
         self.logger = logging.getLogger('SunoBot')
         self.logger.setLevel(logging.INFO)
@@ -95,7 +214,8 @@ class SunoBot:
                     user_agent='Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
                     accept_downloads=True,
                     ignore_https_errors=True,
-                    bypass_csp=True  # Add this to bypass Content Security Policy
+                    bypass_csp=True,  # Add this to bypass Content Security Policy
+                    args=['--blink-settings=imagesEnabled=false']  # Skip image loading in the browser itself
                 )
                 await self.context.add_init_script("""
                     Object.defineProperty(navigator, 'webdriver', {
@@ -103,11 +223,34 @@ class SunoBot:
                     });
                 """)
                 self.browser = self.context.browser
+                self._init_page_pool()
                 self.logger.info("Browser initialized successfully with persistent context")
         except Exception as e:
             self.logger.error(f"Failed to initialize browser: {str(e)}")
             raise
 
+    def _init_page_pool(self) -> None:
+        """Seed the page pool with the page the persistent context opens with"""
+        self._page_pool = asyncio.Queue()
+        for page in self.context.pages[:1]:
+            self._page_pool.put_nowait(page)
+
+    async def acquire(self) -> Page:
+        """Take an idle page from the pool, opening a new one only if none is idle"""
+        if not self.context:
+            await self.initialize_browser()
+        if self._page_pool.empty():
+            return await self.context.new_page()
+        return self._page_pool.get_nowait()
+
+    async def release(self, page: Page) -> None:
+        """Return a page to the pool after dropping its DOM"""
+        try:
+            await page.goto('about:blank')
+        except Exception as e:
+            self.logger.error(f"Error resetting page: {str(e)}")
+        self._page_pool.put_nowait(page)
+
     async def refresh_cookies(self, page: Page) -> bool:
         """Refresh and verify cookies are working"""
         try:
@@ -118,9 +261,8 @@ class SunoBot:
                 return True
                 
             # Verify essential cookies are present
-            essential_cookies = ['session_id', 'auth_token']  # adjust these names based on actual cookie names
-            missing_cookies = [cookie for cookie in essential_cookies 
-                             if not any(c['name'] == cookie for c in cookies)]
+            missing_cookies = [cookie for cookie in self.ESSENTIAL_COOKIES 
+                             if not any(self._cookie_matches(c, cookie) for c in cookies)]
             
             if missing_cookies:
                 self.logger.warning(f"Missing essential cookies: {missing_cookies}")
@@ -132,16 +274,37 @@ class SunoBot:
             self.logger.error(f"Error refreshing cookies: {str(e)}")
             return False
 
+    @staticmethod
+    def _cookie_matches(cookie: dict, name: str) -> bool:
+        """Match a cookie by name, including Clerk's '<name>_<suffix>' variants"""
+        return cookie['name'] == name or cookie['name'].startswith(f"{name}_")
+
+    async def has_valid_session_cookies(self, min_ttl: int = 600) -> bool:
+        """Check that essential cookies exist, mark a signed-in user and are not about to expire"""
+        try:
+            cookies = await self.context.cookies(self.base_url)
+        except Exception as e:
+            self.logger.warning(f"Could not read cookies: {str(e)}")
+            return False
+
+        # Session cookies report expires == -1 and live as long as the browser profile
+        deadline = time.time() + min_ttl
+        valid_cookies = [c for c in cookies
+                         if c.get('value') not in ('', '0')
+                         and (c.get('expires', -1) == -1 or c['expires'] > deadline)]
+        return all(any(self._cookie_matches(c, name) for c in valid_cookies)
+                   for name in self.ESSENTIAL_COOKIES)
+
     @asynccontextmanager
     async def browser_context(self):
         page = None
         try:
-            if not self.context:
-                await self.initialize_browser()
-            
-            page = await self.context.new_page()
-            await page.route("**/*.{png,jpg,jpeg,gif,svg}", lambda route: route.abort())
-            await self.verify_session(page)
+            page = await self.acquire()
+            if await self.has_valid_session_cookies():
+                # A stale session is caught later by the 401 handling in _get_auth callers
+                self.logger.info("Session cookies still valid, skipping session verification")
+            else:
+                await self.verify_session(page)
             
             yield page
             
@@ -149,17 +312,13 @@ class SunoBot:
             self.logger.error(f"Browser context error: {str(e)}")
             raise
         finally:
-            try:
-                if page:
-                    await page.close()
-            except Exception as e:
-                self.logger.error(f"Error closing page: {str(e)}")
+            if page:
+                await self.release(page)
 
     async def verify_session(self, page: Page) -> bool:
         try:
             # Increased timeout and changed wait_until condition
             await page.goto(f"{self.base_url}/me", timeout=60000, wait_until='load')
-            await asyncio.sleep(2)  # Give extra time for the page to settle
             
             login_selectors = [
                 '.profile-section',
@@ -173,17 +332,13 @@ class SunoBot:
                 '.user-profile'
             ]
             
-            # Try multiple times to find any of the selectors
-            for _ in range(3):  # 3 attempts
-                for selector in login_selectors:
-                    try:
-                        element = await page.wait_for_selector(selector, timeout=10000)
-                        if element:
-                            self.logger.info(f"Login detected via selector: {selector}")
-                            return True
-                    except:
-                        continue
-                await asyncio.sleep(2)  # Wait between attempts
+            # Wait for whichever selector shows up first; the timeout is an upper bound
+            try:
+                await page.wait_for_selector(', '.join(login_selectors), timeout=30000)
+                self.logger.info("Login detected via profile selectors")
+                return True
+            except PlaywrightTimeoutError:
+                pass
             
             # If we get here, we need manual login
             self.logger.info("User not logged in. Please log in manually...")
@@ -207,68 +362,82 @@ class SunoBot:
             raise SessionError("Failed to verify session status")
 
 
+    async def _extract_auth_headers(self, response: Response) -> dict:
+        """Build API auth headers from a profile API response"""
+        headers = await response.all_headers()
+        request_headers = await response.request.all_headers()
+        return {
+            'authorization': request_headers.get('authorization', ''),
+            'session-id': headers.get('session-id', ''),
+            'device-id': request_headers.get('device-id', ''),
+            'affiliate-id': request_headers.get('affiliate-id', 'undefined')
+        }
+
+    async def _get_auth(self, page: Page) -> dict:
+        """Return cached auth headers, capturing fresh ones from the following page when needed"""
+        async with self._auth_lock:
+            if self._auth and time.monotonic() < self._auth_expiry:
+                return self._auth
+
+            self._auth = None
+
+            for retry in range(self.MAX_RETRIES):
+                # Start waiting before navigating so the first profiles response isn't missed
+                response_task = asyncio.create_task(page.wait_for_event(
+                    'response',
+                    predicate=lambda r: "/api/profiles/" in r.url and r.status == 200,
+                    timeout=15000
+                ))
+                try:
+                    # Visit the following page to trigger API calls
+                    # The profiles response is all we need, so don't wait for the SPA to go idle
+                    await page.goto(f"{self.base_url}/me/following", timeout=30000, wait_until='domcontentloaded')
+
+                    # Scroll to trigger API calls if needed
+                    await page.evaluate('window.scrollTo(0, document.body.scrollHeight)')
+
+                    try:
+                        response = await response_task
+                    except PlaywrightTimeoutError:
+                        self.logger.warning(f"Auth capture attempt {retry + 1} timed out waiting for headers")
+                    else:
+                        self._auth = await self._extract_auth_headers(response)
+                        self._auth_expiry = time.monotonic() + self.AUTH_TTL
+                        self.logger.info("Captured fresh authentication headers")
+                        return self._auth
+
+                except Exception as e:
+                    self.logger.warning(f"Auth capture attempt {retry + 1} failed: {str(e)}")
+                    await asyncio.sleep(5)
+                finally:
+                    if not response_task.done():
+                        response_task.cancel()
+                    elif not response_task.cancelled():
+                        response_task.exception()  # Mark a timed-out wait as handled
+
+                if retry == 0:
+                    # Headers usually fail to show up because the session lapsed
+                    await self.verify_session(page)
+
+            raise SessionError("Failed to capture auth headers")
+
     async def unfollow_user(self, page: Page, username: str) -> bool:
         """Optimized unfollow method using working auth capture approach"""
         if username in self.processed_users:
             self.logger.info(f"Skipping already processed user: {username}")
             return True
 
-        auth_headers = None
-
-        async def capture_auth_headers(response):
-            """Capture authentication headers from response"""
-            nonlocal auth_headers
-            if "/api/profiles/" in response.url and response.status == 200:
-                headers = await response.all_headers()
-                request_headers = await response.request.all_headers()
-                auth_headers = {
-                    'authorization': request_headers.get('authorization', ''),
-                    'session-id': headers.get('session-id', ''),
-                    'device-id': request_headers.get('device-id', ''),
-                    'affiliate-id': request_headers.get('affiliate-id', 'undefined'),
-                    'content-type': 'text/plain;charset=UTF-8',
-                    'origin': 'https://suno.com',
-                    'referer': 'https://suno.com/'
-                }
-                self.logger.info("Successfully captured auth headers from API response")
-
-        async def ensure_auth_headers():
-            """Get fresh auth headers using the working approach"""
-            nonlocal auth_headers
-            auth_headers = None
-            
-            # Setup response listener
-            page.on("response", capture_auth_headers)
-            
-            try:
-                # Visit the following page to trigger API calls
-                await page.goto(f"{self.base_url}/me/following", timeout=30000, wait_until='networkidle')
-                await page.wait_for_selector('button:has-text("Following")', timeout=10000)
-                await asyncio.sleep(2)
-                
-                # Scroll to trigger API calls if needed
-                await page.evaluate('window.scrollTo(0, document.body.scrollHeight)')
-                await asyncio.sleep(2)
-                
-                # Wait for headers with timeout
-                start_time = time.time()
-                while not auth_headers and time.time() - start_time < 20:
-                    await asyncio.sleep(1)
-                
-                if not auth_headers:
-                    raise SessionError("Failed to capture auth headers")
-                    
-                return auth_headers
-                
-            finally:
-                page.remove_listener("response", capture_auth_headers)
-
         for attempt in range(self.MAX_RETRIES):
             try:
                 self.logger.info(f"Attempting to unfollow {username} (attempt {attempt + 1}/{self.MAX_RETRIES})")
                 
-                # Get fresh auth headers using working approach
-                headers = await ensure_auth_headers()
+                # Reuse cached auth headers, capturing them only when missing or expired
+                auth_headers = await self._get_auth(page)
+                headers = {
+                    **auth_headers,
+                    'origin': 'https://suno.com',
+                    'referer': 'https://suno.com/'
+                }
                 
                 # Prepare API request payload
                 payload = {
@@ -276,29 +445,36 @@ class SunoBot:
                     "handle": username
                 }
                 
+                # Also waits out a rate limit hit by a concurrent unfollow
+                await self._bucket.acquire()
+                
                 # Make API request
                 response = await page.request.post(
-                    'https://studio-api.prod.suno.com/api/profiles/follow',
+                    f"{self.api_url}/api/profiles/follow",
                     headers=headers,
-                    data=json.dumps(payload)
+                    data=payload  # Playwright serialises dicts as JSON and sets the content-type
                 )
                 
                 # Check response status
                 if response.status == 204:
                     self.processed_users.add(username)
                     self.logger.info(f"Successfully unfollowed {username}")
-                    await asyncio.sleep(random.uniform(30, 60))
+                    self._bucket.on_success()
                     return True
                     
                 elif response.status == 401:
-                    self.logger.warning("Session expired, refreshing...")
-                    await self.verify_session(page)
+                    # Only invalidate if no other task has refreshed the headers yet
+                    if self._auth is auth_headers:
+                        self.logger.warning("Session expired, refreshing...")
+                        self._auth = None
                     continue
                     
                 elif response.status == 429:
                     retry_after = int(response.headers.get('Retry-After', '60'))
-                    self.logger.warning(f"Rate limited. Waiting {retry_after} seconds...")
-                    await asyncio.sleep(retry_after)
+                    self.logger.warning(f"Rate limited. Pausing all unfollows for {retry_after} seconds...")
+                    self._ratelimit_until = max(self._ratelimit_until, time.monotonic() + retry_after)
+                    self._bucket.on_rate_limited(retry_after)
+                    self.logger.info(f"Unfollow rate lowered to one every {1 / self._bucket.rate:.1f} seconds")
                     continue
                     
                 else:
@@ -329,211 +505,174 @@ class SunoBot:
 
 
 
-    async def get_users(self, page: Page, page_type: str) -> List[User]:
+    async def get_users(self, page: Page, page_type: str) -> Set[str]:
         """Get users using API pagination with auth refresh"""
         MAX_API_RETRIES = 3
+        MAX_RATE_LIMIT_RETRIES = 10
         users: Set[str] = set()
-        current_page = 1
         total_pages = None
-        auth_headers = None
-
-        async def capture_auth_headers(response):
-            """Capture authentication headers from response"""
-            if (f"/api/profiles/{page_type}" in response.url and 
-                response.status == 200):
-                nonlocal auth_headers
-                headers = await response.all_headers()
-                request_headers = await response.request.all_headers()
-                auth_headers = {
-                    'authorization': request_headers.get('authorization', ''),
-                    'session-id': headers.get('session-id', ''),
-                    'device-id': request_headers.get('device-id', ''),
-                    'affiliate-id': request_headers.get('affiliate-id', 'undefined')
-                }
-                self.logger.info("Captured fresh authentication headers")
-
-        async def refresh_auth_headers():
-            """Refresh authentication headers by reloading the page"""
-            nonlocal auth_headers
-            auth_headers = None
-            self.logger.info("Refreshing authentication headers...")
-            
-            for retry in range(3):  # Add retries for auth refresh
-                try:
-                    # First go to home page
-                    await page.goto(self.base_url, timeout=60000, wait_until='domcontentloaded')
-                    await asyncio.sleep(3)
-                    
-                    # Then go to target page
-                    await page.goto(
-                        f"{self.base_url}/me/{page_type}", 
-                        timeout=60000, 
-                        wait_until='domcontentloaded'
-                    )
-                    await asyncio.sleep(3)
-                    
-                    # Scroll and wait for headers
-                    await page.evaluate('window.scrollTo(0, document.body.scrollHeight)')
-                    await asyncio.sleep(2)
-                    
-                    # Wait for headers with timeout
-                    start_time = time.time()
-                    while not auth_headers and time.time() - start_time < 20:  # Reduced timeout to 20 seconds
-                        await page.evaluate('window.scrollTo(0, document.body.scrollHeight)')
-                        await asyncio.sleep(1)
-                    
-                    if auth_headers:
-                        self.logger.info("Successfully refreshed authentication headers")
-                        return
-                        
-                except Exception as e:
-                    self.logger.warning(f"Auth refresh attempt {retry + 1} failed: {str(e)}")
-                    await asyncio.sleep(5)
-                    
-            # If we get here, all retries failed
-            raise Exception("Failed to refresh authentication headers after 3 attempts")
 
         try:
-            # Setup response listener
-            page.on("response", capture_auth_headers)
-            
-            # Initial navigation to capture auth headers
-            await page.goto(f"{self.base_url}/me/{page_type}", timeout=60000, wait_until='domcontentloaded')
-            await asyncio.sleep(3)
-            await page.evaluate('window.scrollTo(0, document.body.scrollHeight)')
-            await asyncio.sleep(2)
-            
-            # Wait for initial auth headers
-            start_time = time.time()
-            while not auth_headers and time.time() - start_time < 20:  # Reduced initial timeout
-                await page.evaluate('window.scrollTo(0, document.body.scrollHeight)')
-                await asyncio.sleep(1)
-            
-            if not auth_headers:
-                raise Exception("Failed to capture initial authentication headers")
-            
-            # Process all pages
-            while current_page <= (total_pages or 1):
-                self.logger.info(f"Fetching page {current_page} of {total_pages or '?'}")
-                
+            semaphore = asyncio.Semaphore(8)
+
+            async def fetch_page(session: aiohttp.ClientSession, page_number: int) -> dict:
+                """Fetch a single page of profiles, backing off on 429/502 and refreshing auth on 401"""
                 api_retry_count = 0
+                rate_limit_count = 0
                 while api_retry_count < MAX_API_RETRIES:
-                    try:
-                        # Prepare headers for fetch
-                        headers_str = ', '.join([f"'{k}': '{v}'" for k, v in auth_headers.items()])
-                        
-                        # Make authenticated API call
-                        response_data = await page.evaluate(f"""
-                            async () => {{
-                                const response = await fetch(
-                                    'https://studio-api.prod.suno.com/api/profiles/{page_type}?page={current_page}',
-                                    {{
-                                        headers: {{{headers_str}}}
-                                    }}
-                                );
-                                if (!response.ok) {{
-                                    throw new Error(`HTTP error! status: ${{response.status}}`);
-                                }}
-                                return await response.json();
-                            }}
-                        """)
-                        
-                        # If we got here, request was successful
-                        break
-                        
-                    except Exception as api_error:
-                        api_retry_count += 1
-                        error_msg = str(api_error)
-                        
-                        if "HTTP error! status: 502" in error_msg:
-                            self.logger.warning(f"Got 502 error, retrying ({api_retry_count}/{MAX_API_RETRIES})...")
-                            await asyncio.sleep(5)
-                            continue
-                        elif "HTTP error! status: 401" in error_msg:
-                            self.logger.info("Auth token expired, refreshing...")
-                            await refresh_auth_headers()
-                            continue
-                        else:
-                            self.logger.error(f"API call failed with error: {error_msg}")
-                            raise
-
-                if api_retry_count == MAX_API_RETRIES:
-                    raise Exception(f"Failed to fetch page {current_page} after {MAX_API_RETRIES} retries")
-                
+                    used_headers = await self._get_auth(page)
+                    async with semaphore:
+                        # Hold off while any request is inside a Retry-After window
+                        delay = self._ratelimit_until - time.monotonic()
+                        while delay > 0:
+                            await asyncio.sleep(delay)
+                            delay = self._ratelimit_until - time.monotonic()
+
+                        async with session.get(
+                            f"{self.api_url}/api/profiles/{page_type}",
+                            params={'page': page_number},
+                            headers=used_headers
+                        ) as response:
+                            status = response.status
+                            if status == 200:
+                                return orjson.loads(await response.read())
+                            retry_after = response.headers.get('Retry-After', '60')
+
+                    if status == 429:
+                        # Rate limits pause every fetch and have their own, larger budget
+                        rate_limit_count += 1
+                        if rate_limit_count > MAX_RATE_LIMIT_RETRIES:
+                            raise Exception(f"Still rate limited on {page_type} page {page_number} after {MAX_RATE_LIMIT_RETRIES} retries")
+                        try:
+                            retry_after = int(retry_after)
+                        except (ValueError, TypeError):
+                            retry_after = 60
+                        self.logger.warning(f"Rate limited on {page_type} page {page_number}. Pausing all requests for {retry_after} seconds...")
+                        self._ratelimit_until = max(self._ratelimit_until, time.monotonic() + retry_after)
+                        continue
+
+                    api_retry_count += 1
+                    if status == 502:
+                        self.logger.warning(f"Got 502 error on {page_type} page {page_number}, retrying ({api_retry_count}/{MAX_API_RETRIES})...")
+                        await asyncio.sleep(5)
+                    elif status == 401:
+                        # Only invalidate if no other task has refreshed the headers yet
+                        if self._auth is used_headers:
+                            self.logger.info(f"Auth token expired while fetching {page_type}, refreshing...")
+                            self._auth = None
+                    else:
+                        raise Exception(f"HTTP error! status: {status} on {page_type} page {page_number}")
+
+                raise Exception(f"Failed to fetch {page_type} page {page_number} after {MAX_API_RETRIES} retries")
+
+            def add_profiles(response_data: dict, page_number: int) -> None:
                 if not response_data or not isinstance(response_data, dict):
                     raise Exception("Invalid API response format")
-                
-                # Update total pages on first response
-                if total_pages is None and 'num_total_profiles' in response_data:
-                    total_profiles = response_data['num_total_profiles']
-                    total_pages = -(-total_profiles // 20)  # Ceiling division
-                    self.logger.info(f"Total profiles: {total_profiles}, Pages: {total_pages}")
-                
+
                 if 'profiles' not in response_data:
                     raise Exception("No profiles key in response")
-                
-                # Process users from current page
+
                 previous_count = len(users)
+                # Hoisted lookups; this loop runs once per followed/following profile
+                validate = User._USERNAME_RE.match
+                add = users.add
                 for profile in response_data['profiles']:
-                    if 'handle' in profile:
-                        cleaned_username = profile['handle'].replace('@', '').strip()
-                        if User.validate_username(cleaned_username):
-                            users.add(cleaned_username)
-                
-                new_users = len(users) - previous_count
-                self.logger.info(f"Added {new_users} users from page {current_page}")
-                
-                if new_users == 0 and current_page > 1:
-                    self.logger.info("No new users found, ending pagination")
-                    break
-                
-                current_page += 1
-                await asyncio.sleep(1)
-                        
+                    handle = profile.get('handle')
+                    if handle and isinstance(handle, str):
+                        handle = handle.strip().lstrip('@')
+                        if validate(handle):
+                            add(handle)
+
+                self.logger.info(f"Added {len(users) - previous_count} users from {page_type} page {page_number}")
+
+            async with aiohttp.ClientSession() as session:
+                # First page tells us how many pages there are
+                self.logger.info(f"Fetching {page_type} page 1 of ?")
+                first_page = await fetch_page(session, 1)
+                add_profiles(first_page, 1)
+
+                if 'num_total_profiles' in first_page:
+                    total_profiles = first_page['num_total_profiles']
+                    total_pages = -(-total_profiles // 20)  # Ceiling division
+                    self.logger.info(f"Total {page_type} profiles: {total_profiles}, Pages: {total_pages}")
+
+                # Fetch the remaining pages concurrently
+                if total_pages and total_pages > 1:
+                    self.logger.info(f"Fetching {page_type} pages 2-{total_pages} concurrently")
+                    tasks = [asyncio.ensure_future(fetch_page(session, page_number))
+                             for page_number in range(2, total_pages + 1)]
+                    try:
+                        pages = await asyncio.gather(*tasks)
+                    finally:
+                        # Don't leave fetches running against the session once it closes
+                        for task in tasks:
+                            if not task.done():
+                                task.cancel()
+                        await asyncio.gather(*tasks, return_exceptions=True)
+                    for page_number, response_data in enumerate(pages, start=2):
+                        add_profiles(response_data, page_number)
+
+                    # Single pause after the batch rather than one per page
+                    await asyncio.sleep(1)
+
         except Exception as e:
             self.logger.error(f"Error getting {page_type}: {str(e)}")
             raise
-        finally:
-            page.remove_listener("response", capture_auth_headers)
         
         self.logger.info(f"Final {page_type} count: {len(users)}")
-        return [User(username=username) for username in users]
+        return users
 
 
     async def find_and_unfollow_nonreciprocal(self, page: Page) -> None:
+        progress_fh = None
         try:
-            self.logger.info("Getting list of users you follow...")
-            following = await self.get_users(page, "following")
-            
-            self.logger.info("Getting list of your followers...")
-            followers = await self.get_users(page, "followers")
+            # Both crawls share the cached auth headers and only touch the page to refresh them
+            self.logger.info("Getting lists of users you follow and your followers...")
+            crawls = [asyncio.ensure_future(self.get_users(page, "following")),
+                      asyncio.ensure_future(self.get_users(page, "followers"))]
+            try:
+                following, followers = await asyncio.gather(*crawls)
+            finally:
+                # A failed crawl must not leave the other one navigating the page during cleanup
+                for crawl in crawls:
+                    if not crawl.done():
+                        crawl.cancel()
+                await asyncio.gather(*crawls, return_exceptions=True)
             
-            following_usernames = {user.username for user in following}
-            follower_usernames = {user.username for user in followers}
-            users_to_unfollow = following_usernames - follower_usernames
+            users_to_unfollow = following - followers
             
             self.logger.info(f"Found {len(users_to_unfollow)} users who don't follow back")
             
-            progress_file = os.path.join(self.script_dir, 'unfollow_progress.txt')
-            with open(progress_file, 'w') as f:
-                f.write('\n'.join(self.processed_users))
+            users_to_unfollow -= self.processed_users
+            self.logger.info(f"{len(users_to_unfollow)} users left after skipping previously unfollowed users")
             
-            chunk_size = 5
-            for i in range(0, len(users_to_unfollow), chunk_size):
-                chunk = list(users_to_unfollow)[i:i + chunk_size]
-                
-                for username in chunk:
+            # The token bucket paces the POSTs; the semaphore only bounds how many are in flight
+            max_in_flight = 5
+            semaphore = asyncio.Semaphore(max_in_flight)
+            progress_fh = self._open_progress_file()
+
+            async def unfollow_one(username: str) -> None:
+                async with semaphore:
                     if await self.unfollow_user(page, username):
                         # Update progress file
-                        with open(progress_file, 'a') as f:
-                            f.write(f'\n{username}')
-                
-                if i + chunk_size < len(users_to_unfollow):
-                    await asyncio.sleep(random.uniform(60, 120))
+                        progress_fh.write(f'{username}\n')
+
+            tasks = [asyncio.ensure_future(unfollow_one(username)) for username in users_to_unfollow]
+            try:
+                await asyncio.gather(*tasks)
+            finally:
+                for task in tasks:
+                    if not task.done():
+                        task.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
                     
         except Exception as e:
             self.logger.error(f"Error in find_and_unfollow_nonreciprocal: {str(e)}")
             raise
+        finally:
+            if progress_fh:
+                progress_fh.close()
+            self._save_rate()
 
     async def handle_rate_limit(self, response: Response) -> None:
         try:
@@ -560,6 +699,7 @@ class SunoBot:
                 except Exception:
                     pass
                 self.context = None
+                self._page_pool = None
                 
             if hasattr(self, 'browser') and self.browser:
                 self.browser = None